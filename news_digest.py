@@ -6,11 +6,28 @@ Fetches RSS feeds, summarizes with Gemini (or fallback to headlines),
 and sends via Resend email API.
 """
 
+import io
 import os
+import argparse
+import hashlib
+import json
+import random
+import re
 import sys
+import asyncio
+import calendar
 import time
-import textwrap
+import uuid
+import pickle
+import shelve
+import sqlite3
+import threading
+from typing import TypedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html import escape, unescape
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
 
 # ---- Python 3.9 compat ----
 try:
@@ -22,35 +39,44 @@ except Exception:
         packages_distributions = None
 
 # ---- Dependencies ----
+# feedparser is imported on first use (see _require_feedparser)
+feedparser = None
 try:
-    import feedparser
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError as e:
     print(f"Missing dependency: {e}. Install with: pip install feedparser requests", file=sys.stderr)
     sys.exit(1)
 
+# aiohttp is optional; without it feeds are fetched on a thread pool.
+# It is imported only when a feed needs downloading (see _load_aiohttp),
+# so fully cached runs skip its ~0.25 s import.
+aiohttp = None
+
+# lxml is optional; without it every feed goes through feedparser
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# orjson is optional; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---- Config from environment ----
 GOOGLE_API_KEY = os.getenv("GEMINI_KEY", "").strip()  # Note: using GEMINI_KEY to match your secrets
-YOUR_EMAIL = os.getenv("YOUR_EMAIL", "").strip()
+YOUR_EMAIL = os.getenv("YOUR_EMAIL", "").strip()  # One address or a comma-separated list
 RESEND_API_KEY = os.getenv("RESEND_KEY", "").strip()
+RECIPIENTS = [e.strip() for e in YOUR_EMAIL.split(",") if e.strip()]
 
-if not YOUR_EMAIL or not RESEND_API_KEY:
-    print("ERROR: YOUR_EMAIL and RESEND_KEY environment variables are required!", file=sys.stderr)
-    sys.exit(1)
-
-# Gemini is optional
-GEMINI_AVAILABLE = False
+# Gemini is optional; the SDK (gRPC, protobuf, ...) is only imported
+# once a digest actually needs it, see _load_gemini
+GEMINI_AVAILABLE = bool(GOOGLE_API_KEY)
 genai = None
 gen_exceptions = None
-try:
-    if GOOGLE_API_KEY:
-        import google.generativeai as genai
-        from google.api_core import exceptions as gen_exceptions
-        genai.configure(api_key=GOOGLE_API_KEY)
-        GEMINI_AVAILABLE = True
-except Exception as e:
-    print(f"⚠️  Gemini SDK not available: {e}")
-    GEMINI_AVAILABLE = False
 
 # ---- RSS Feeds ----
 RSS_FEEDS = [
@@ -74,97 +100,821 @@ RSS_FEEDS = [
 
 MAX_PER_FEED = 5
 MAX_ARTICLES = 40
+PROMPT_PREVIEW_CHARS = 120  # Summary characters per article sent to Gemini
+FETCH_TIMEOUT = 10  # seconds per feed
+FETCH_CONNECT_TIMEOUT = 3.05  # seconds; just over the 3 s TCP retransmit window
+SEND_TIMEOUT = (FETCH_CONNECT_TIMEOUT, 30)  # seconds (connect, read) for Resend
+HTTP_MAX_RETRY_AFTER = FETCH_TIMEOUT  # seconds; longest Retry-After we'll sleep for
+USER_AGENT = "PU-News-Digest/1.0"
+# Feeds are verbose XML and compress 5-10x on the wire
+FEED_HEADERS = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+
+# ---- Cache ----
+CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "power-utilities-news",
+)
+FEED_CACHE_TTL = 30 * 60  # seconds; covers servers that ignore conditional GETs
+DIGEST_CACHE_DIR = os.path.join(CACHE_DIR, "digests")
+DIGEST_MAX_AGE = 30 * 24 * 3600  # seconds; digest files are read and kept this long
+LAST_DIGEST_TTL = 36 * 3600  # seconds; longer than the daily cron period, plus slack for late runs
+LAST_DIGEST_PATH = os.path.join(CACHE_DIR, "last.json")
+MODELS_CACHE_PATH = os.path.join(CACHE_DIR, "models.json")
+MODELS_CACHE_TTL = 24 * 3600  # seconds
+ARTICLE_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds
 
+# Semantic digest reuse (only if sentence-transformers + numpy are installed)
+SEMANTIC_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.97
+SEMANTIC_MAX_AGE = DIGEST_MAX_AGE  # Hits are useless once the digest file is gone
+
+# Flash-class models only: picking 7 stories and writing two sentences
+# each doesn't need a pro model's latency or price
 GEMINI_MODELS = [
-    "models/gemini-1.5-flash",  # Highest free quota
-    "models/gemini-1.5-flash-8b",
-    "models/gemini-1.5-pro",
+    "models/gemini-2.5-flash-lite",  # Fastest, highest free quota
+    "models/gemini-2.5-flash",
+    "models/gemini-2.0-flash",
 ]
 
+GEMINI_ATTEMPTS = 5  # per model
+GEMINI_MAX_BACKOFF = 60  # seconds; a longer server-suggested wait means "try another model"
+
+# The model returns the picked stories as JSON; HTML is rendered locally
+DIGEST_SECTIONS = ["Top Stories", "Market & Regulatory Updates", "Technology & Innovation"]
+
+class Article(TypedDict):
+    """One story in Gemini's JSON reply (mirrors response_schema below)."""
+    title: str
+    url: str
+    what: str
+    why: str
+    section: str
+
+# The schema stays a plain dict rather than list[Article] so it can carry
+# the section enum and required fields, which the SDK can't infer from a TypedDict
+DIGEST_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    # ~3x what 7 stories need; 2.5 models also bill their thinking against
+    # this cap, so a tighter one risks a truncated JSON array
+    "max_output_tokens": 2048,
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string"},
+                "url": {"type": "string"},
+                "what": {"type": "string"},
+                "why": {"type": "string"},
+                "section": {"type": "string", "enum": DIGEST_SECTIONS},
+            },
+            "required": ["title", "url", "what", "why", "section"],
+        },
+    },
+}
+
+# ---- Email ----
+_BANNER = "=" * 50
+RESEND_MAX_RECIPIENTS = 50  # Resend's limit on the "to" array of one email
+# The envelope around the digest, split at the date and body so sending
+# is plain concatenation
+HTML_HEAD = """
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <h2 style="color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px;">
+            ⚡ Power & Utilities Daily Brief
+        </h2>
+        <p style="color: #7f8c8d; font-size: 14px;">
+            """
+HTML_DATE_END = """
+        </p>
+        """
+HTML_FOOT = """
+        <hr style="margin-top: 30px; border: 1px solid #ecf0f1;">
+        <p style="font-size: 12px; color: #95a5a6;">
+            Generated using AI from multiple industry sources. 
+        </p>
+    </div>
+    """
+
+_FALLBACK_HEADER = (
+    "<div style='font-family: Arial, sans-serif;'>"
+    "<h3 style='color: #e74c3c;'>⚠️ AI Summary Unavailable - Top Headlines</h3>"
+    "<p style='color: #7f8c8d; font-size: 14px;'>The AI service is temporarily unavailable or quota exceeded. Here are today's top stories:</p>"
+)
+_FALLBACK_ITEM = """
+        <div style="margin-bottom: 15px; padding-bottom: 10px; border-bottom: 1px solid #ecf0f1;">
+            <strong>{i}. <a href="{link}" style="color: #3498db; text-decoration: none;">{title}</a></strong>
+        </div>
+        """
+_FALLBACK_FOOTER = "</div>"
+
+_SECTION_HEADER = "<h3>{name}</h3>\n"
+_STORY_ITEM = """<div style="margin-bottom: 20px;">
+  <h4 style="margin-bottom: 8px; color: #2c3e50;"><a href="{url}" style="color: #3498db; text-decoration: none;">{title}</a></h4>
+  <p style="margin: 4px 0;">{what}</p>
+  <p style="margin: 4px 0; color: #7f8c8d; font-size: 14px;">{why}</p>
+</div>
+"""
+
+# ---- HTTP ----
+# One pooled session for all outbound requests, so keep-alive connections
+# are reused (requests already sends Accept-Encoding: gzip, deflate).
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After only up to HTTP_MAX_RETRY_AFTER.
+
+    urllib3 would otherwise sleep for whatever a 429/503 asks, e.g. an hour.
+    """
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, HTTP_MAX_RETRY_AFTER)
+
+_HTTP = requests.Session()
+# Feeds: one retry of a failed connect and nothing else, so a feed costs at
+# most about FETCH_TIMEOUT; a 5xx just means the cached copy is served
+_FEED_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=1, connect=1, read=False, status=0,
+        respect_retry_after_header=False,  # Else a 429/503 with Retry-After is still retried
+    ),
+)
+# Resend: POST is retried too, as send_email sets an Idempotency-Key so
+# Resend drops a duplicate if the first attempt did go through
+_SEND_ADAPTER = HTTPAdapter(
+    max_retries=_CappedRetry(
+        total=3,
+        read=False,  # A read timeout is final; retrying would multiply the wait
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=_CappedRetry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        raise_on_status=False,  # Hand back the last response so it gets logged
+    ),
+)
+_HTTP.mount("https://", _FEED_ADAPTER)
+_HTTP.mount("http://", _FEED_ADAPTER)  # A few feeds are still plain HTTP
+_HTTP.mount("https://api.resend.com/", _SEND_ADAPTER)  # Longest prefix wins
+
 # ---- Functions ----
 def log(msg: str):
     print(msg, flush=True)
 
+_FEEDPARSER_LOCK = threading.Lock()
+
+def _require_feedparser():
+    """Import and tune feedparser, the fallback for feeds lxml can't handle.
+
+    Called from fetch threads, so a missing install fails that feed only.
+    """
+    global feedparser
+    if feedparser is not None:
+        return
+    with _FEEDPARSER_LOCK:
+        if feedparser is not None:
+            return
+        try:
+            import feedparser as parser
+        except ImportError as e:
+            raise ImportError(f"{e}. Install with: pip install feedparser") from e
+        # Summaries go through _clean_summary and everything rendered is
+        # escaped, so feedparser's HTML sanitizer is wasted work
+        parser.SANITIZE_HTML = False
+        # Feeds use RFC 822 (RSS) or W3C-DTF (Atom) dates; skip the exotic handlers
+        try:
+            from feedparser import datetimes
+            datetimes._date_handlers[:] = [datetimes._parse_date_rfc822, datetimes._parse_date_w3dtf]
+        except (ImportError, AttributeError):
+            pass  # Internal layout differs in this feedparser version
+        feedparser = parser  # Only published once it's configured
+
+def _load_aiohttp():
+    """Import aiohttp on first use; False if it isn't installed."""
+    global aiohttp
+    if aiohttp is None:
+        try:
+            import aiohttp as client
+        except ImportError:
+            client = False
+        aiohttp = client
+    return bool(aiohttp)
+
+def _load_gemini():
+    global genai, gen_exceptions
+    if genai is None:
+        import google.generativeai as sdk
+        from google.api_core import exceptions
+        sdk.configure(api_key=GOOGLE_API_KEY)
+        genai, gen_exceptions = sdk, exceptions
+
+def _json_dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def _json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_BOILER_RE = re.compile(r"\s*The post .+? appeared first on .*$")
+
+def _clean_summary(s):
+    """Plain-text summary: no markup, entities decoded, single spaces, no WordPress footer."""
+    s = unescape(_TAG_RE.sub(" ", s))
+    s = _WS_RE.sub(" ", s).strip()
+    return _BOILER_RE.sub("", s)
+
+# Parsers return raw (title, link, summary, pub) entries; _normalize turns
+# them into item dicts. pub is a date string (lxml) or struct_time (feedparser).
+
+def _parse_entries(d):
+    # Entries are FeedParserDicts: .get() is a plain dict lookup, whereas
+    # getattr() goes through FeedParserDict.__getattr__ key mapping
+    entries = []
+    for e in d.get("entries", [])[:MAX_PER_FEED]:
+        entries.append((
+            (e.get("title") or "").strip(),
+            (e.get("link") or "").strip(),
+            e.get("summary") or e.get("description") or "",
+            e.get("published_parsed") or e.get("updated_parsed"),
+        ))
+    return entries
+
+def _parse_date(value):
+    """Unix timestamp of an RSS/Atom date string, or None."""
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)  # RSS (RFC 822)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))  # Atom
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def _child_text(elem, *names):
+    for child in elem:
+        if isinstance(child.tag, str) and child.tag.rpartition("}")[2] in names:
+            text = "".join(child.itertext()).strip()
+            if text:
+                return text
+    return ""
+
+def _entry_link(elem):
+    # Atom carries the URL in href; prefer rel="alternate" (the default)
+    for child in elem:
+        if isinstance(child.tag, str) and child.tag.rpartition("}")[2] == "link":
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                return href.strip()
+            if not href and child.text and child.text.strip():
+                return child.text.strip()
+    # Like feedparser, only a permalink guid stands in for a missing link;
+    # opaque ids (isPermaLink="false", tag: URIs, bare numbers) give ""
+    for child in elem:
+        if isinstance(child.tag, str) and child.tag.rpartition("}")[2] in ("guid", "id"):
+            text = (child.text or "").strip()
+            if child.get("isPermaLink", "true").lower() != "false" and text.startswith(("http://", "https://")):
+                return text
+    return ""
+
+def _join_link(base_url, link):
+    # urljoin("...feed/", "") is the feed URL itself, which would make
+    # every linkless item in a feed look like the same article
+    return urljoin(base_url, link) if link else ""
+
+# Item element per feed type (feedparser's version names); a known type
+# lets iterparse match one exact tag instead of sniffing every namespace
+_ANY_ITEM = ("{*}item", "{*}entry")
+_ITEM_TAGS = {
+    "rss20": "item",
+    "rss10": "{http://purl.org/rss/1.0/}item",
+    "atom10": "{http://www.w3.org/2005/Atom}entry",
+}
+_ROOT_TYPES = {
+    "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF": "rss10",
+    "{http://www.w3.org/2005/Atom}feed": "atom10",
+}
+
+def _feed_type(root):
+    if root.tag == "rss":
+        return "rss20" if (root.get("version") or "").startswith("2") else None
+    return _ROOT_TYPES.get(root.tag)
+
+def _parse_feed_stream(body: bytes, limit: int, base_url="", tag=_ANY_ITEM):
+    """Pull title/link/summary/date from RSS or Atom items without building a full DOM.
+
+    Returns (entries, feed_type); feed_type is None if the root wasn't recognised.
+    """
+    entries = []
+    feed_type = None
+    for _, elem in etree.iterparse(
+        io.BytesIO(body), events=("end",), tag=tag,
+        huge_tree=False, recover=True, resolve_entities=False,
+    ):
+        if not entries:
+            feed_type = _feed_type(elem.getroottree().getroot())
+        entries.append((
+            _child_text(elem, "title"),
+            _join_link(base_url, _entry_link(elem)),
+            _child_text(elem, "summary", "description") or _child_text(elem, "content", "encoded"),
+            _child_text(elem, "pubDate", "published", "updated", "date"),
+        ))
+        # Free the processed item (and any siblings before it)
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+        if len(entries) >= limit:
+            break
+    return entries, feed_type
+
+def _parse_fast(body, url, feed_type=None):
+    """(entries, feed_type) via lxml, or None if feedparser has to take over.
+
+    Stops after MAX_PER_FEED items, so it's cheap enough to run inline.
+    """
+    if etree is None:
+        return None
+    try:
+        tag = _ITEM_TAGS.get(feed_type, _ANY_ITEM)
+        entries, detected = _parse_feed_stream(body, MAX_PER_FEED, url, tag)
+    except etree.Error:
+        return None
+    return (entries, detected or feed_type) if entries else None
+
+def _parse_fallback(body, url, content_type):
+    _require_feedparser()
+    d = feedparser.parse(body, response_headers={
+        "content-location": url,
+        "content-type": content_type,
+    })
+    return _parse_entries(d), d.get("version") or None
+
+def _parse_body(body, url, content_type, feed_type=None):
+    """Parse a feed payload, returning (entries, feed_type)."""
+    return _parse_fast(body, url, feed_type) or _parse_fallback(body, url, content_type)
+
+def _open_article_cache():
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        return shelve.open(os.path.join(CACHE_DIR, "items.db"), flag="c", writeback=False)
+    except Exception as e:
+        log(f"  ⚠️  Article cache unavailable: {e}")
+        return None
+
+def _drop_article_cache(shelf, e):
+    """Close a shelf that failed mid-run; the caller carries on without it."""
+    log(f"  ⚠️  Article cache unusable: {e}")
+    try:
+        shelf.close()
+    except Exception:
+        pass
+    return None
+
+def _prune_article_cache(shelf, now):
+    cutoff = now - ARTICLE_CACHE_MAX_AGE
+    for key in [k for k, item in shelf.items() if item["ts"] < cutoff]:
+        del shelf[key]
+
+def _normalize(entries, now, shelf=None):
+    """Item dicts for raw entries, reusing ones already normalized on an earlier run.
+
+    ``now`` (Unix seconds) stands in as the timestamp of undated items.
+    """
+    items = []
+    for title, link, summary, pub in entries:
+        title = title or "(no title)"
+        key = hashlib.sha1(f"{link}\x00{title}".encode("utf-8")).hexdigest()
+        item = shelf.get(key) if shelf is not None else None
+        if item is None:
+            if isinstance(pub, str):
+                ts = _parse_date(pub)
+            else:
+                ts = calendar.timegm(pub) if pub else None
+            item = {
+                "title": title,
+                "link": link,
+                "summary": _clean_summary(summary)[:600],  # Cap length
+                "ts": ts or now,
+            }
+            if shelf is not None:
+                shelf[key] = item
+        items.append(item)
+    return items
+
+def _open_feed_cache():
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        db = sqlite3.connect(os.path.join(CACHE_DIR, "feeds.sqlite"))
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS feeds ("
+            "url TEXT PRIMARY KEY, etag TEXT, modified TEXT, fetched_at REAL, items BLOB, feed_type TEXT)"
+        )
+        if "feed_type" not in {row[1] for row in db.execute("PRAGMA table_info(feeds)")}:
+            db.execute("ALTER TABLE feeds ADD COLUMN feed_type TEXT")
+        return db
+    except (OSError, sqlite3.Error) as e:
+        log(f"  ⚠️  Feed cache unavailable: {e}")
+        return None
+
+def _load_feed_cache(db):
+    if db is None:
+        return {}
+    cache = {}
+    try:
+        rows = db.execute(
+            "SELECT url, etag, modified, fetched_at, items, feed_type FROM feeds"
+        ).fetchall()
+    except sqlite3.Error as e:
+        log(f"  ⚠️  Feed cache unreadable: {e}")
+        return {}
+    for url, etag, modified, fetched_at, items, feed_type in rows:
+        try:
+            items = pickle.loads(items)
+        except Exception:
+            continue  # Corrupt row, refetch
+        if items and not isinstance(items[0].get("ts"), int):
+            continue  # Written before timestamps were ints
+        cache[url] = {
+            "etag": etag,
+            "modified": modified,
+            "fetched_at": fetched_at,
+            "items": items,
+            "feed_type": feed_type,
+        }
+    return cache
+
+def _store_feed_cache(db, url, entry, fetched_at):
+    if db is None:
+        return
+    db.execute(
+        "INSERT OR REPLACE INTO feeds (url, etag, modified, fetched_at, items, feed_type) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (url, entry.get("etag"), entry.get("modified"), fetched_at,
+         pickle.dumps(entry["items"]), entry.get("feed_type")),
+    )
+
+def _conditional_headers(cached):
+    headers = dict(FEED_HEADERS)
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("modified"):
+        headers["If-Modified-Since"] = cached["modified"]
+    return headers
+
+def _check_content_type(content_type):
+    """Reject responses that clearly aren't feeds, e.g. an HTML error page."""
+    ctype = content_type.split(";", 1)[0].strip().lower()
+    if ctype and not (ctype.startswith("application/") or "xml" in ctype):
+        raise ValueError(f"Not a feed (Content-Type: {ctype})")
+
+def _feed_result(cached, headers, entries, feed_type):
+    # A 200 with no entries: keep serving what we had
+    if not entries and cached.get("items"):
+        return {**cached, "status": 304}
+    return {
+        "etag": headers.get("ETag"),
+        "modified": headers.get("Last-Modified"),
+        "entries": entries,
+        "feed_type": feed_type,
+        "status": 200,
+    }
+
+def _fetch_bytes_sync(url, cached):
+    """GET a feed over the shared session; body is None on a 304."""
+    resp = _HTTP.get(url, headers=_conditional_headers(cached), timeout=(FETCH_CONNECT_TIMEOUT, FETCH_TIMEOUT))
+    if resp.status_code == 304:
+        return None, resp.headers
+    resp.raise_for_status()
+    _check_content_type(resp.headers.get("Content-Type", ""))
+    return resp.content, resp.headers
+
+def _fetch_one(url, cached):
+    body, headers = _fetch_bytes_sync(url, cached)
+    if body is None:
+        return {**cached, "status": 304}
+    entries, feed_type = _parse_body(
+        body, url, headers.get("Content-Type", ""), cached.get("feed_type"),
+    )
+    return _feed_result(cached, headers, entries, feed_type)
+
+def _fetch_all_threaded(urls, cache):
+    # Workers spend nearly all their time blocked on the network, so give
+    # every feed its own thread and the slowest feed bounds the wall time
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(urls) or 1) as pool:
+        futures = {pool.submit(_fetch_one, u, cache.get(u, {})): u for u in urls}
+        for fut in as_completed(futures):
+            try:
+                results[futures[fut]] = fut.result()
+            except Exception as ex:
+                results[futures[fut]] = ex
+    return results
+
+async def _fetch_bytes(session, url, cached):
+    async with session.get(url, headers=_conditional_headers(cached)) as resp:
+        if resp.status == 304:
+            return None, resp.headers
+        resp.raise_for_status()
+        _check_content_type(resp.headers.get("Content-Type", ""))
+        return await resp.read(), resp.headers
+
+async def _fetch_and_parse(session, url, cached):
+    body, headers = await _fetch_bytes(session, url, cached)
+    if body is None:
+        return {**cached, "status": 304}
+    # lxml stops after MAX_PER_FEED items (a few ms for every feed together),
+    # so only the much slower feedparser fallback is moved off the loop
+    parsed = _parse_fast(body, url, cached.get("feed_type"))
+    if parsed is None:
+        parsed = await asyncio.get_running_loop().run_in_executor(
+            None, _parse_fallback, body, url, headers.get("Content-Type", ""),
+        )
+    entries, feed_type = parsed
+    return _feed_result(cached, headers, entries, feed_type)
+
+async def _gather_all(urls, cache):
+    timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT, sock_connect=FETCH_CONNECT_TIMEOUT)
+    # Shared pool for all feeds, at most two sockets to any one host
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=2)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        results = await asyncio.gather(
+            *[_fetch_and_parse(session, u, cache.get(u, {})) for u in urls],
+            return_exceptions=True,
+        )
+    return dict(zip(urls, results))
+
+_NON_WORD_RE = re.compile(r"\W+")
+
+def _canonical_url(link):
+    parts = urlsplit(link)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    ])
+    url = host + parts.path.rstrip("/")
+    return f"{url}?{query}" if query else url
+
+def _dedupe(items):
+    """Drop syndicated copies: same canonical URL or same normalized title.
+
+    Keeps the first occurrence, so sort before calling.
+    """
+    # 8-byte blake2b digests keep the set small; person= keeps URL and
+    # title keys in separate namespaces
+    seen = set()
+    unique = []
+    for it in items:
+        keys = []
+        if it["link"]:
+            url = _canonical_url(it["link"])
+            keys.append(hashlib.blake2b(url.encode("utf-8"), digest_size=8, person=b"url").digest())
+        if it["title"] != "(no title)":
+            title = _NON_WORD_RE.sub(" ", it["title"].lower()).strip()[:80]
+            keys.append(hashlib.blake2b(title.encode("utf-8"), digest_size=8, person=b"title").digest())
+        if any(k in seen for k in keys):
+            continue
+        seen.update(keys)
+        unique.append(it)
+    return unique
+
 def fetch_articles():
-    log("=" * 50)
+    log(_BANNER)
     log("🚀 Starting Power & Utilities News Digest")
-    log("=" * 50)
+    log(_BANNER)
     log("📰 Fetching articles from RSS feeds...")
 
+    db = _open_feed_cache()
+    cache = _load_feed_cache(db)
+    now = time.time()
+    results = {}
+    stale = []
+    for url in RSS_FEEDS:
+        cached = cache.get(url)
+        if cached and now - (cached["fetched_at"] or 0) < FEED_CACHE_TTL:
+            results[url] = {**cached, "status": "cached"}
+        else:
+            stale.append(url)
+
+    # Download every feed concurrently on one event loop (or a thread pool
+    # when aiohttp is missing); results are still assembled in RSS_FEEDS
+    # order so ties in the sort below are broken deterministically.
+    if stale:
+        if _load_aiohttp():
+            results.update(asyncio.run(_gather_all(stale, cache)))
+        else:
+            results.update(_fetch_all_threaded(stale, cache))
+
+    # Normalize here rather than in the workers so the shelf has one user
+    shelf = _open_article_cache()
     all_items = []
     for url in RSS_FEEDS:
+        res = results.get(url)
+        if isinstance(res, (asyncio.TimeoutError, requests.Timeout)):
+            log(f"  ✗ Timed out reading {url}, skipping")
+            continue
+        if isinstance(res, Exception) or res is None:
+            log(f"  ✗ Error reading {url}: {res}")
+            continue
+        if "entries" in res:
+            entries = res.pop("entries")
+            try:
+                res["items"] = _normalize(entries, int(now), shelf)
+            except Exception as e:  # dbm or pickle error: normalize from scratch
+                shelf = _drop_article_cache(shelf, e)
+                res["items"] = _normalize(entries, int(now))
+        note = {304: " (not modified)", "cached": " (cached)"}.get(res["status"], "")
+        log(f"  ✓ Found {len(res['items'])} articles from {url}{note}")
+        if res["status"] != "cached" and db is not None:
+            try:
+                _store_feed_cache(db, url, res, now)
+            except sqlite3.Error as e:
+                log(f"  ⚠️  Could not cache feeds: {e}")
+                db.close()
+                db = None  # Carry on uncached
+        all_items.extend(res["items"])
+
+    if db is not None:
         try:
-            d = feedparser.parse(url)
-            entries = d.entries[:MAX_PER_FEED] if hasattr(d, "entries") else []
-            log(f"  ✓ Found {len(entries)} articles from {url}")
-            for e in entries:
-                title = (getattr(e, "title", "") or "").strip()
-                link = (getattr(e, "link", "") or "").strip()
-                summary = (getattr(e, "summary", "") or getattr(e, "description", "") or "").strip()
-                all_items.append({
-                    "title": title or "(no title)",
-                    "link": link,
-                    "summary": summary[:600],  # Cap length
-                })
-        except Exception as ex:
-            log(f"  ✗ Error reading {url}: {ex}")
-
-    return all_items[:MAX_ARTICLES]
+            db.commit()
+        except sqlite3.Error as e:
+            log(f"  ⚠️  Could not cache feeds: {e}")
+        finally:
+            db.close()
+    if shelf is not None:
+        try:
+            _prune_article_cache(shelf, now)
+            shelf.close()
+        except Exception as e:
+            _drop_article_cache(shelf, e)
+
+    # Newest first, so the freshest copy of a syndicated story is the one kept
+    all_items.sort(key=lambda x: x["ts"], reverse=True)
+    unique = _dedupe(all_items)
+    if len(unique) < len(all_items):
+        log(f"  🧹 Dropped {len(all_items) - len(unique)} duplicate articles")
+
+    return unique[:MAX_ARTICLES]
 
 def build_prompt(items):
-    prompt = """You are a Power & Utilities industry expert. From these articles, select the 7 most important news items for industry professionals.
-
-For each selected article, provide:
-- Title (keep original)
-- One clear sentence explaining what happened
-- One sentence on why this matters for the P&U industry
-- The original URL
-
-Format as clean HTML for email with sections:
-1. <h3>Top Stories</h3> (3 most important)
-2. <h3>Market & Regulatory Updates</h3>
-3. <h3>Technology & Innovation</h3>
-
-Each article should be formatted as:
-<div style="margin-bottom: 20px;">
-  <h4 style="margin-bottom: 8px; color: #2c3e50;"><a href="URL" style="color: #3498db; text-decoration: none;">TITLE</a></h4>
-  <p style="margin: 4px 0;">WHAT HAPPENED</p>
-  <p style="margin: 4px 0; color: #7f8c8d; font-size: 14px;">WHY IT MATTERS</p>
-</div>
+    prompt = """You are a Power & Utilities industry expert. Pick the 7 most important articles for industry professionals. For each return:
+- title, url: as given
+- what: one sentence, what happened
+- why: one sentence, why it matters for P&U
+- section: "Top Stories" (top 3), "Market & Regulatory Updates" or "Technology & Innovation"
 
-Articles to review:
+Articles (title | url | preview):
 """
-    for i, it in enumerate(items, 1):
-        prompt += f"\n{i}. {it['title']}\n   Summary: {it['summary']}\n   URL: {it['link']}\n"
-    
-    return prompt
+    articles = "\n".join(
+        f"- {it['title']} | {it['link']} | {it['summary'][:PROMPT_PREVIEW_CHARS]}"
+        for it in items
+    )
+    return prompt + articles + "\n"
 
-def try_gemini_summarize(prompt):
+def render_digest(stories: list[Article]):
+    """Email HTML for the stories Gemini picked, grouped by section."""
+    by_section = {name: [] for name in DIGEST_SECTIONS}
+    for story in stories:
+        by_section.get(story.get("section"), by_section[DIGEST_SECTIONS[-1]]).append(story)
+
+    parts = []
+    for name, section in by_section.items():
+        if not section:
+            continue
+        parts.append(_SECTION_HEADER.format(name=escape(name)))
+        parts.extend(
+            _STORY_ITEM.format(**{f: escape(story.get(f, "")) for f in ("url", "title", "what", "why")})
+            for story in section
+        )
+    return "".join(parts)
+
+def _retry_delay(e):
+    """Seconds the API asked us to wait (RetryInfo detail or Retry-After), or None."""
+    for detail in getattr(e, "details", None) or []:
+        if isinstance(detail, dict):  # REST transport
+            delay = str(detail.get("retryDelay") or "")
+            if delay.endswith("s"):
+                try:
+                    return float(delay[:-1])
+                except ValueError:
+                    pass
+        elif hasattr(getattr(detail, "retry_delay", None), "seconds"):  # gRPC RetryInfo
+            return detail.retry_delay.seconds + detail.retry_delay.nanos / 1e9
+    try:
+        return float(e.response.headers["Retry-After"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+def _daily_quota_spent(e):
+    """True if a QuotaFailure detail names a per-day quota, which no backoff will fix."""
+    for detail in getattr(e, "details", None) or []:
+        if isinstance(detail, dict):  # REST transport
+            ids = [v.get("quotaId", "") for v in detail.get("violations") or [] if isinstance(v, dict)]
+        else:  # gRPC QuotaFailure
+            ids = [getattr(v, "quota_id", "") for v in getattr(detail, "violations", None) or []]
+        if any("PerDay" in str(quota_id) for quota_id in ids):
+            return True
+    return False
+
+def _generate(model_name, prompt, stop=None):
+    """Digest HTML from one model, with backoff; gives up early once ``stop`` is set."""
+    log(f"  Trying model: {model_name}")
+    model = genai.GenerativeModel(model_name)
+    stop = stop or threading.Event()
+
+    other_failures = 0
+    for attempt in range(GEMINI_ATTEMPTS):
+        if stop.is_set():
+            raise RuntimeError("Cancelled")
+        try:
+            resp = model.generate_content(prompt, generation_config=DIGEST_GENERATION_CONFIG)
+            if hasattr(resp, "text") and resp.text:
+                stories = _json_loads(resp.text)
+                if stories:
+                    if not (isinstance(stories, list) and all(isinstance(s, dict) for s in stories)):
+                        raise ValueError("Malformed response")
+                    html = render_digest(stories)
+                    log(f"  ✓ Success with {model_name}")
+                    return html
+            raise RuntimeError("Empty response")
+        except gen_exceptions.ResourceExhausted as e:
+            delay = _retry_delay(e)
+            # The per-day 429 still carries a short RetryInfo, so check
+            # which quota tripped before trusting the delay
+            if (
+                _daily_quota_spent(e)
+                or (delay is None and "quota" in str(e).lower())
+                or (delay or 0) > GEMINI_MAX_BACKOFF
+            ):
+                log(f"  ✗ Quota exceeded for {model_name}")
+                raise  # Won't clear up within this run
+            last_error = e
+        except gen_exceptions.ServerError as e:  # 5xx and timeouts
+            delay = _retry_delay(e)
+            last_error = e
+        except Exception as e:
+            other_failures += 1
+            if other_failures > 1:
+                raise
+            delay = None  # One more go for anything else
+            last_error = e
+        if attempt + 1 < GEMINI_ATTEMPTS and not stop.is_set():
+            if delay is None:
+                delay = min(GEMINI_MAX_BACKOFF, 2 ** attempt + random.random())
+            log(f"  … retrying {model_name} in {delay:.1f}s ({last_error.__class__.__name__})")
+            if stop.wait(delay):
+                raise RuntimeError("Cancelled")
+    raise RuntimeError(f"Still failing after {GEMINI_ATTEMPTS} attempts: {last_error}")
+
+def _available_models():
+    """GEMINI_MODELS filtered to what this API key can call, in preference order.
+
+    The account's model list is cached for MODELS_CACHE_TTL; if it can't be
+    fetched, every configured model is tried as before.
+    """
+    try:
+        with open(MODELS_CACHE_PATH, "rb") as f:
+            cached = _json_loads(f.read())
+        if time.time() - cached["fetched_at"] < MODELS_CACHE_TTL:
+            names = set(cached["models"])
+            return [m for m in GEMINI_MODELS if m in names]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        names = [
+            m.name for m in genai.list_models()
+            if "generateContent" in m.supported_generation_methods
+        ]
+    except Exception as e:
+        log(f"  ⚠️  Could not list Gemini models: {e}")
+        return list(GEMINI_MODELS)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(MODELS_CACHE_PATH, "wb") as f:
+            f.write(_json_dumps({"fetched_at": time.time(), "models": names}))
+    except OSError:
+        pass
+    names = set(names)
+    return [m for m in GEMINI_MODELS if m in names]
+
+def try_gemini_summarize(prompt, models=None):
     if not GEMINI_AVAILABLE:
         raise RuntimeError("Gemini not available")
+    _load_gemini()
     
-    for model_name in GEMINI_MODELS:
+    for model_name in _available_models() if models is None else models:
         try:
-            log(f"  Trying model: {model_name}")
-            model = genai.GenerativeModel(model_name)
-            
-            for attempt in range(2):
-                try:
-                    resp = model.generate_content(prompt)
-                    if hasattr(resp, "text") and resp.text:
-                        log(f"  ✓ Success with {model_name}")
-                        return resp.text.strip()
-                    raise RuntimeError("Empty response")
-                except gen_exceptions.ResourceExhausted as e:
-                    if "quota" in str(e).lower():
-                        log(f"  ✗ Quota exceeded for {model_name}")
-                        raise  # Don't retry quota errors
-                    time.sleep(2)
-                except Exception as e:
-                    if attempt == 0:
-                        time.sleep(1)
-                    else:
-                        raise
+            return _generate(model_name, prompt)
         except gen_exceptions.ResourceExhausted:
             continue  # Try next model
         except Exception as e:
@@ -173,64 +923,261 @@ def try_gemini_summarize(prompt):
     
     raise RuntimeError("All Gemini models failed or quota exceeded")
 
-def format_headlines_fallback(items):
-    html = "<div style='font-family: Arial, sans-serif;'>"
-    html += "<h3 style='color: #e74c3c;'>⚠️ AI Summary Unavailable - Top Headlines</h3>"
-    html += "<p style='color: #7f8c8d; font-size: 14px;'>The AI service is temporarily unavailable or quota exceeded. Here are today's top stories:</p>"
-    
-    for i, it in enumerate(items[:10], 1):
-        html += f"""
-        <div style="margin-bottom: 15px; padding-bottom: 10px; border-bottom: 1px solid #ecf0f1;">
-            <strong>{i}. <a href="{it['link']}" style="color: #3498db; text-decoration: none;">{it['title']}</a></strong>
-        </div>
-        """
-    
-    html += "</div>"
-    return html
+def _run_daemon(fn, *args):
+    """Run fn on a daemon thread, so a straggler can't hold up interpreter exit."""
+    fut = Future()
+    def run():
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as e:
+            fut.set_exception(e)
+    threading.Thread(target=run, daemon=True).start()
+    return fut
 
-def send_email(content):
-    full_html = f"""
-    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-        <h2 style="color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px;">
-            ⚡ Power & Utilities Daily Brief
-        </h2>
-        <p style="color: #7f8c8d; font-size: 14px;">
-            {datetime.now().strftime('%A, %B %d, %Y')}
-        </p>
-        {content}
-        <hr style="margin-top: 30px; border: 1px solid #ecf0f1;">
-        <p style="font-size: 12px; color: #95a5a6;">
-            Generated using AI from multiple industry sources. 
-        </p>
-    </div>
+def try_gemini_race(prompt):
+    """Ask the first two models at once and keep whichever answers first.
+
+    Spends quota on both, so it's opt-in (--race / RACE_MODELS=1).
     """
-    
-    log(f"📧 Sending email to {YOUR_EMAIL}...")
-    
-    response = requests.post(
-        "https://api.resend.com/emails",
-        headers={
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json"
-        },
-        json={
-            "from": "PowerBrief <onboarding@resend.dev>",
-            "to": [YOUR_EMAIL],
-            "subject": f"⚡ Power & Utilities Daily - {datetime.now().strftime('%B %d')}",
-            "html": full_html
-        }
-    )
-    
-    if response.status_code == 200:
-        log(f"✅ Email sent successfully!")
-        log(f"   Response: {response.json()}")
-        return True
+    if not GEMINI_AVAILABLE:
+        raise RuntimeError("Gemini not available")
+    _load_gemini()
+
+    models = _available_models()
+    contenders = models[:2]
+    if not contenders:
+        raise RuntimeError("No configured Gemini model is available")
+    # Not a ThreadPoolExecutor: its workers are joined at exit, so the
+    # email would wait on the loser's remaining retries
+    stop = threading.Event()
+    pending = {_run_daemon(_generate, m, prompt, stop): m for m in contenders}
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                model_name = pending.pop(fut)
+                try:
+                    return fut.result()
+                except Exception as e:
+                    log(f"  ✗ Failed with {model_name}: {e}")
+    finally:
+        # An in-flight request can't be aborted, but no retry follows it
+        stop.set()
+
+    return try_gemini_summarize(prompt, models[2:])
+
+def _load_cached_digest(key):
+    path = os.path.join(DIGEST_CACHE_DIR, f"{key}.txt")
+    try:
+        if time.time() - os.path.getmtime(path) > DIGEST_MAX_AGE:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+def _store_digest(key, digest):
+    try:
+        os.makedirs(DIGEST_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(DIGEST_CACHE_DIR, f"{key}.txt"), "w", encoding="utf-8") as f:
+            f.write(digest)
+    except OSError as e:
+        log(f"  ⚠️  Could not cache digest: {e}")
+
+def _prune_digests(now):
+    # The cache directory is carried between runs by the workflow, so
+    # drop digests neither the exact nor the semantic tier will read again
+    cutoff = now - DIGEST_MAX_AGE
+    try:
+        with os.scandir(DIGEST_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".txt") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+    except OSError:
+        pass
+
+_embedder = None
+
+def _embed_titles(items):
+    """Unit-length embedding of the joined titles, or None if the model isn't installed."""
+    global _embedder
+    if _embedder is False:
+        return None
+    try:
+        if _embedder is None:
+            from sentence_transformers import SentenceTransformer
+            _embedder = SentenceTransformer(SEMANTIC_MODEL)
+        text = "\n".join(it["title"] for it in items)
+        return _embedder.encode(text, normalize_embeddings=True)
+    except Exception as e:
+        if _embedder is not None:
+            log(f"  ⚠️  Semantic cache disabled: {e}")
+        _embedder = False
+        return None
+
+def _load_semantic_index():
+    import numpy as np
+    try:
+        with np.load(os.path.join(DIGEST_CACHE_DIR, "semantic.npz")) as idx:
+            emb, keys, created = idx["emb"], idx["keys"], idx["created"]
+    except (OSError, ValueError, KeyError):
+        return None
+    fresh = created >= time.time() - SEMANTIC_MAX_AGE
+    return emb[fresh], keys[fresh], created[fresh]
+
+def _semantic_lookup(emb):
+    idx = _load_semantic_index()
+    if idx is None or not len(idx[1]):
+        return None
+    scores = idx[0] @ emb  # Both sides are unit vectors: dot == cosine
+    best = int(scores.argmax())
+    if scores[best] >= SEMANTIC_THRESHOLD:
+        return str(idx[1][best])
+    return None
+
+def _semantic_store(emb, key):
+    import numpy as np
+    idx = _load_semantic_index()
+    if idx is None:
+        emb_all, keys, created = emb[None, :], np.array([key]), np.array([time.time()])
     else:
-        log(f"❌ Email failed with status {response.status_code}")
-        log(f"   Error: {response.text}")
-        return False
+        emb_all = np.vstack([idx[0], emb[None, :]]) if len(idx[1]) else emb[None, :]
+        keys = np.append(idx[1], key)
+        created = np.append(idx[2], time.time())
+    path = os.path.join(DIGEST_CACHE_DIR, "semantic.npz")
+    try:
+        os.makedirs(DIGEST_CACHE_DIR, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, emb=emb_all, keys=keys, created=created)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        log(f"  ⚠️  Could not update semantic cache: {e}")
+
+def summarize_cached(prompt, items, use_cache=True, race=False):
+    """Gemini summary behind an exact (prompt hash) and a semantic (titles) cache."""
+    key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    emb = None
+    if use_cache:
+        digest = _load_cached_digest(key)
+        if digest:
+            log("  ↩ Reusing cached digest (same prompt)")
+            return digest
+        emb = _embed_titles(items)
+        if emb is not None:
+            hit = _semantic_lookup(emb)
+            digest = _load_cached_digest(hit) if hit else None
+            if digest:
+                log("  ↩ Reusing cached digest (near-identical headlines)")
+                return digest
+
+    digest = try_gemini_race(prompt) if race else try_gemini_summarize(prompt)
+    _store_digest(key, digest)
+    _prune_digests(time.time())
+    if emb is None:
+        emb = _embed_titles(items)
+    if emb is not None:
+        _semantic_store(emb, key)
+    return digest
+
+def _articles_signature(items):
+    # Sorted so the same article set matches even if the feeds reorder it
+    return hashlib.sha256(
+        b"\0".join(sorted((it["link"] + "\n" + it["title"]).encode("utf-8") for it in items))
+    ).hexdigest()
+
+def _load_last_digest():
+    try:
+        with open(LAST_DIGEST_PATH, "rb") as f:
+            last = _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if time.time() - last.get("at", 0) > LAST_DIGEST_TTL:
+        return {}
+    return last
+
+def _store_last_digest(sig, digest):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(LAST_DIGEST_PATH, "wb") as f:
+            f.write(_json_dumps({"sig": sig, "html": digest, "at": int(time.time())}))
+    except OSError as e:
+        log(f"  ⚠️  Could not save digest: {e}")
+
+def format_headlines_fallback(items):
+    parts = [_FALLBACK_HEADER]
+    parts.extend(
+        _FALLBACK_ITEM.format(i=i, link=escape(it["link"]), title=escape(it["title"]))
+        for i, it in enumerate(items[:10], 1)
+    )
+    parts.append(_FALLBACK_FOOTER)
+    return "".join(parts)
+
+def send_email(content, now=None):
+    now = now or datetime.now()
+    date_long = now.strftime("%A, %B %d, %Y")
+    date_short = now.strftime("%B %d")
+    full_html = f"{HTML_HEAD}{date_long}{HTML_DATE_END}{content}{HTML_FOOT}"
+    subject = f"⚡ Power & Utilities Daily - {date_short}"
+
+    # One request per 50 recipients, sent one after another on the pooled
+    # session; a digest rarely needs more than one batch
+    ok = True
+    for start in range(0, len(RECIPIENTS), RESEND_MAX_RECIPIENTS):
+        batch = RECIPIENTS[start:start + RESEND_MAX_RECIPIENTS]
+        log(f"📧 Sending email to {', '.join(batch)}...")
+
+        try:
+            response = _HTTP.post(
+                "https://api.resend.com/emails",
+                headers={
+                    "Authorization": f"Bearer {RESEND_API_KEY}",
+                    "Content-Type": "application/json",
+                    "Idempotency-Key": str(uuid.uuid4()),
+                },
+                data=_json_dumps({
+                    "from": "PowerBrief <onboarding@resend.dev>",
+                    "to": batch,
+                    "subject": subject,
+                    "html": full_html
+                }),
+                timeout=SEND_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            log(f"❌ Email failed: {e}")
+            ok = False
+            continue
+
+        if response.status_code == 200:
+            log(f"✅ Email sent successfully!")
+            log(f"   Response: {response.json()}")
+        else:
+            log(f"❌ Email failed with status {response.status_code}")
+            log(f"   Error: {response.text}")
+            ok = False
+    return ok
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Power & Utilities news digest")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="regenerate the AI digest even if a cached one matches")
+    parser.add_argument("--race", action="store_true",
+                        default=os.getenv("RACE_MODELS", "").strip() == "1",
+                        help="query the top two Gemini models in parallel (uses both quotas)")
+    parser.add_argument("--no-llm", action="store_true",
+                        help="skip Gemini and send the headlines-only digest")
+    return parser.parse_args(argv)
+
+def _check_env():
+    """Fail before any feed is fetched if the email can't be sent."""
+    if not RECIPIENTS or not RESEND_API_KEY:
+        print("ERROR: YOUR_EMAIL and RESEND_KEY environment variables are required!", file=sys.stderr)
+        sys.exit(1)
+
+def main(argv=None):
+    args = parse_args(argv)
+    _check_env()
+    now = datetime.now()  # One timestamp for the whole run (body date + subject)
 
-def main():
     # Fetch articles
     items = fetch_articles()
     log(f"📊 Total articles collected: {len(items)}")
@@ -243,28 +1190,38 @@ def main():
     log("🤖 Generating digest with AI...")
     digest_html = None
     
-    if GEMINI_AVAILABLE:
-        try:
-            prompt = build_prompt(items)
-            digest_html = try_gemini_summarize(prompt)
-        except Exception as e:
-            log(f"⚠️  AI summarization failed: {e}")
-            log("📋 Falling back to headlines-only format...")
-            digest_html = format_headlines_fallback(items)
+    if GEMINI_AVAILABLE and not args.no_llm:
+        sig = _articles_signature(items)
+        last = {} if args.no_cache else _load_last_digest()
+        if last.get("sig") == sig and last.get("html"):
+            log("↩ Unchanged inputs — reusing prior digest")
+            digest_html = last["html"]
+        else:
+            try:
+                prompt = build_prompt(items)
+                digest_html = summarize_cached(prompt, items, use_cache=not args.no_cache, race=args.race)
+                _store_last_digest(sig, digest_html)
+            except Exception as e:
+                log(f"⚠️  AI summarization failed: {e}")
+                log("📋 Falling back to headlines-only format...")
+                digest_html = format_headlines_fallback(items)
+    elif args.no_llm:
+        log("ℹ️  --no-llm given. Using headlines format.")
+        digest_html = format_headlines_fallback(items)
     else:
-        log("ℹ️  GEMINI_KEY not set or SDK unavailable. Using headlines format.")
+        log("ℹ️  GEMINI_KEY not set. Using headlines format.")
         digest_html = format_headlines_fallback(items)
     
     # Send email
-    if send_email(digest_html):
-        log("=" * 50)
+    if send_email(digest_html, now):
+        log(_BANNER)
         log("✅ Process completed successfully!")
-        log("=" * 50)
+        log(_BANNER)
         return 0
     else:
-        log("=" * 50)
+        log(_BANNER)
         log("❌ Email sending failed!")
-        log("=" * 50)
+        log(_BANNER)
         return 1
 
 if __name__ == "__main__":